@@ -11,15 +11,27 @@ class ClienteTriqui:
     Gestiona la conexión con el servidor y la interfaz gráfica.
     """
 
-    def __init__(self, host, port):
+    def __init__(self, host, port, tcp_nodelay=True, buffer_envio=None, buffer_recepcion=None):
         """
         Constructor del cliente.
         Configura la conexión con el servidor y la interfaz gráfica.
         :param host: Dirección IP del servidor.
         :param port: Puerto del servidor.
+        :param tcp_nodelay: Desactivar el algoritmo de Nagle para enviar los movimientos sin demora.
+        :param buffer_envio: Tamaño del buffer de envío (SO_SNDBUF), o None para el del sistema.
+        :param buffer_recepcion: Tamaño del buffer de recepción (SO_RCVBUF), o None para el del sistema.
         """
         # Configuración del socket cliente
         self.cliente = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            if tcp_nodelay:  # Enviar cada escritura de inmediato, sin esperar a acumular datos.
+                self.cliente.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            if buffer_envio:
+                self.cliente.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, buffer_envio)
+            if buffer_recepcion:
+                self.cliente.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, buffer_recepcion)
+        except OSError as e:
+            print(f"No se pudieron aplicar las opciones de socket: {e}")  # Continuar con los valores del sistema.
         self.host = "127.0.0.1"
         self.port = 8000
 
@@ -84,7 +96,7 @@ class ClienteTriqui:
             # Solicitar al usuario que ingrese su nombre.
             nombre = simpledialog.askstring("Nombre", "Ingresa tu nombre:")
             if nombre:  # Si el usuario ingresa un nombre válido.
-                self.cliente.send(nombre.encode()) # Enviar el nombre al servidor.
+                self.cliente.sendall((nombre + "\n").encode()) # Enviar el nombre al servidor (una línea por mensaje).
 
                 # Crear un hilo para recibir mensajes del servidor.
                 hilo_recepcion = threading.Thread(target=self.recibir_mensajes)
@@ -107,15 +119,22 @@ class ClienteTriqui:
 
     # Método para recibir mensajes del servidor.
     def recibir_mensajes(self):
+        pendiente = b""  # Bytes recibidos que aún no forman una línea completa.
         while self.cliente_activo:
+            mensaje = ""
             try:
-                mensaje = self.cliente.recv(1024).decode()
-                print(f"Mensaje recibido: {mensaje}")  # Depuración
-                if not mensaje:  # Si no hay mensaje, el servidor cerró la conexión.
+                bloque = self.cliente.recv(1024)
+                if not bloque:  # Si no hay datos, el servidor cerró la conexión.
                     print("El servidor cerró la conexión.")  # Depuración
                     break
-                datos = json.loads(mensaje) # Cargar mensaje JSON recibido.
-                self.procesar_mensaje(datos) # Procesar el mensaje recibido
+                pendiente += bloque
+                # El servidor envía un mensaje JSON por línea y puede agrupar varios en una sola escritura.
+                *lineas, pendiente = pendiente.split(b"\n")
+                for linea in lineas:
+                    mensaje = linea.decode()
+                    print(f"Mensaje recibido: {mensaje}")  # Depuración
+                    datos = json.loads(mensaje) # Cargar mensaje JSON recibido.
+                    self.procesar_mensaje(datos) # Procesar el mensaje recibido
             except json.JSONDecodeError as e:
                 print(f"Error al decodificar JSON: {e}, mensaje: {mensaje}")  # Depuración
                 break  # Salir si hay un error al decodificar JSON.
@@ -243,7 +262,7 @@ class ClienteTriqui:
             }
             try:
                 # Enviar el mensaje codificado en formato JSON al servidor.                
-                self.cliente.send(json.dumps(mensaje).encode())
+                self.cliente.sendall((json.dumps(mensaje) + "\n").encode())  # Un mensaje JSON por línea.
                 print("Movimiento enviado al servidor.")  # Depuración                
             except:
                 # Mostrar error si no se pudo enviar el mensaje.                
@@ -356,9 +375,14 @@ if __name__ == "__main__":
     parser.add_argument("--host", type=str, default="localhost", help="Dirección IP del servidor (por defecto: localhost).")
     # Argumento para definir el puerto del servidor.    
     parser.add_argument("--port", type=int, default=8000, help="Puerto del servidor (por defecto: 5000).")
+    # Opciones del socket de conexión con el servidor.
+    parser.add_argument("--sin-nodelay", action="store_true", help="Mantener activo el algoritmo de Nagle (sin TCP_NODELAY).")
+    parser.add_argument("--buffer-envio", type=int, default=None, help="Tamaño de SO_SNDBUF en bytes (por defecto: el del sistema).")
+    parser.add_argument("--buffer-recepcion", type=int, default=None, help="Tamaño de SO_RCVBUF en bytes (por defecto: el del sistema).")
     args = parser.parse_args() # Parsear los argumentos proporcionados.
 
     # Crear una instancia del cliente con los parámetros especificados.
-    cliente = ClienteTriqui(args.host, args.port)
+    cliente = ClienteTriqui(args.host, args.port, tcp_nodelay=not args.sin_nodelay,
+                            buffer_envio=args.buffer_envio, buffer_recepcion=args.buffer_recepcion)
     # Intentar conectar al servidor.
     cliente.conectar()
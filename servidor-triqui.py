@@ -1,23 +1,232 @@
 import socket  # Biblioteca para manejar conexiones de red (sockets).
 import threading  # Biblioteca para manejar hilos concurrentes.
 import json  # Biblioteca para manejar datos en formato JSON.
+import argparse  # Biblioteca para manejar argumentos de línea de comandos.
 import random  # Biblioteca para generar valores aleatorios (turnos, símbolos, etc.).
 import time  # Biblioteca para manejar pausas y temporización.
+import sys  # Biblioteca para acceder a las pilas de ejecución de los hilos.
+import signal  # Biblioteca para manejar señales del sistema operativo.
+import contextlib  # Biblioteca con utilidades para administradores de contexto.
 from datetime import datetime  # Biblioteca para trabajar con fechas y tiempos.
 
+# Administrador de contexto vacío que se usa cuando el perfilado está apagado.
+SIN_MEDICION = contextlib.nullcontext()
+
+# Duración máxima, en segundos, de una ventana de perfilado.
+DURACION_MAXIMA_PERFIL = 300
+
+
+class MedicionFase:
+    """
+    Mide el tiempo de una fase (decodificar, validar, reglas, codificar, enviar)
+    para un tipo de mensaje mientras el perfilado está activo.
+    """
+
+    def __init__(self, perfilador, tipo, fase):
+        """
+        Constructor de la medición.
+        :param perfilador: Perfilador que acumula los tiempos.
+        :param tipo: Tipo del mensaje que se está procesando.
+        :param fase: Nombre de la fase medida.
+        """
+        self.perfilador = perfilador
+        self.etiqueta = f"{tipo};{fase}"  # Etiqueta en formato de pila colapsada.
+        self.anterior = None  # Medición que estaba activa en el hilo antes de esta.
+        self.hijos = 0.0  # Tiempo de las fases anidadas, que se descuenta de esta.
+        self.inicio = 0.0
+
+    def __enter__(self):
+        hilo = threading.get_ident()
+        self.anterior = self.perfilador.fases_actuales.get(hilo)  # Guardar la fase previa (fases anidadas).
+        self.perfilador.fases_actuales[hilo] = self  # Marcar la fase para el muestreador.
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *excepcion):
+        duracion = time.perf_counter() - self.inicio
+        self.perfilador.registrar(self.etiqueta, duracion - self.hijos)  # Registrar solo el tiempo propio.
+        if self.anterior is not None:
+            self.anterior.hijos += duracion
+        hilo = threading.get_ident()
+        if self.anterior is None:
+            self.perfilador.fases_actuales.pop(hilo, None)
+        else:
+            self.perfilador.fases_actuales[hilo] = self.anterior
+        return False
+
+
+class PerfiladorTriqui:
+    """
+    Perfilador por muestreo que se activa en tiempo de ejecución durante una ventana fija.
+    Acumula pilas colapsadas (aptas para flame graphs) y el tiempo por tipo de mensaje y fase.
+    Cuando está apagado, cada punto de medición solo consulta un booleano.
+    """
+
+    def __init__(self, intervalo=0.005, prefijo="perfil"):
+        """
+        Constructor del perfilador.
+        :param intervalo: Segundos entre muestras de las pilas de los hilos.
+        :param prefijo: Prefijo de los archivos de salida.
+        """
+        self.intervalo = intervalo
+        self.prefijo = prefijo
+        self.activo = False  # Indica si hay una ventana de perfilado en curso.
+        self.candado = threading.Lock()  # Protege los acumuladores compartidos.
+        self.pilas = {}  # Pila colapsada -> número de muestras.
+        self.tiempos = {}  # "tipo;fase" -> [segundos acumulados, número de mediciones].
+        self.fases_actuales = {}  # Identificador de hilo -> medición en curso.
+        self.evento = threading.local()  # Tipo del mensaje entrante que atiende cada hilo.
+
+    def fase(self, tipo, fase):
+        """
+        Devuelve un administrador de contexto que mide una fase.
+        Dentro de un evento entrante, la fase se atribuye al tipo de ese evento.
+        :param tipo: Tipo del mensaje que se está procesando.
+        :param fase: Nombre de la fase.
+        :return: Medición activa o un contexto vacío si el perfilado está apagado.
+        """
+        if not self.activo:
+            return SIN_MEDICION
+        return MedicionFase(self, getattr(self.evento, "tipo", None) or tipo, fase)
+
+    def evento_entrante(self, tipo):
+        """
+        Devuelve un administrador de contexto que atribuye al tipo entrante
+        todas las fases medidas mientras se atiende el mensaje.
+        :param tipo: Tipo del mensaje entrante.
+        :return: Contexto del evento o un contexto vacío si el perfilado está apagado.
+        """
+        if not self.activo:
+            return SIN_MEDICION
+        return self.atender_evento(tipo)
+
+    @contextlib.contextmanager
+    def atender_evento(self, tipo):
+        """
+        Marca el tipo del mensaje entrante en el hilo actual mientras dura el bloque.
+        :param tipo: Tipo del mensaje entrante.
+        """
+        anterior = getattr(self.evento, "tipo", None)
+        self.evento.tipo = tipo
+        try:
+            yield
+        finally:
+            self.evento.tipo = anterior
+
+    def registrar(self, etiqueta, segundos):
+        """
+        Acumula el tiempo medido para una fase.
+        :param etiqueta: Etiqueta "tipo;fase".
+        :param segundos: Duración medida.
+        """
+        with self.candado:
+            acumulado = self.tiempos.setdefault(etiqueta, [0.0, 0])
+            acumulado[0] += segundos
+            acumulado[1] += 1
+
+    def iniciar(self, segundos=30):
+        """
+        Inicia una ventana de perfilado en un hilo muestreador.
+        :param segundos: Duración de la ventana (mayor que 0 y hasta DURACION_MAXIMA_PERFIL).
+        :return: True si se inició, False si la duración es inválida o ya había una ventana activa.
+        """
+        try:
+            segundos = float(segundos)  # Aceptar números o textos numéricos.
+        except (TypeError, ValueError):
+            print(f"Duración de perfilado inválida: {segundos!r}")  # Notificar el valor rechazado.
+            return False
+        if not 0 < segundos <= DURACION_MAXIMA_PERFIL:  # También descarta NaN.
+            print(f"La duración del perfilado debe estar entre 0 y {DURACION_MAXIMA_PERFIL} segundos.")
+            return False
+        with self.candado:
+            if self.activo:
+                return False
+            self.pilas = {}
+            self.tiempos = {}
+            self.fases_actuales = {}
+            self.activo = True
+        print(f"Perfilado activado durante {segundos} segundos.")  # Mensaje en la consola.
+        hilo = threading.Thread(target=self.muestrear, args=(segundos,))
+        hilo.daemon = True  # Configurar hilo como demonio.
+        hilo.start()
+        return True
+
+    def muestrear(self, segundos):
+        """
+        Toma muestras periódicas de las pilas de todos los hilos hasta que termina la ventana.
+        :param segundos: Duración de la ventana.
+        """
+        propio = threading.get_ident()
+        try:
+            fin = time.perf_counter() + segundos
+            while time.perf_counter() < fin:
+                for hilo, marco in sys._current_frames().items():
+                    if hilo == propio:  # No muestrear al propio muestreador.
+                        continue
+                    pila = []
+                    while marco is not None:  # Recorrer la pila desde la hoja hasta la raíz.
+                        codigo = marco.f_code
+                        pila.append(f"{codigo.co_name} ({codigo.co_filename.split('/')[-1]}:{codigo.co_firstlineno})")
+                        marco = marco.f_back
+                    pila.reverse()
+                    medicion = self.fases_actuales.get(hilo)
+                    if medicion:  # Añadir la fase en curso como marco hoja para atribuir la muestra.
+                        pila.append(f"[{medicion.etiqueta.replace(';', ':')}]")
+                    colapsada = ";".join(pila)
+                    with self.candado:
+                        self.pilas[colapsada] = self.pilas.get(colapsada, 0) + 1
+                time.sleep(self.intervalo)
+        finally:
+            self.detener()  # Cerrar la ventana aunque el muestreo falle.
+
+    def detener(self):
+        """
+        Termina la ventana de perfilado y escribe los resultados.
+        """
+        with self.candado:
+            self.activo = False
+            pilas, tiempos = self.pilas, self.tiempos
+        marca = datetime.now().strftime("%Y%m%d-%H%M%S")
+        archivo_pilas = f"{self.prefijo}-{marca}.folded"
+        archivo_fases = f"{self.prefijo}-{marca}-fases.folded"
+        try:
+            # Pilas muestreadas: "marco1;marco2;... muestras".
+            with open(archivo_pilas, "w") as salida:
+                for pila, muestras in sorted(pilas.items()):
+                    salida.write(f"{pila} {muestras}\n")
+            # Tiempo por tipo de mensaje y fase en microsegundos: "tipo;fase microsegundos".
+            with open(archivo_fases, "w") as salida:
+                for etiqueta, (total, _) in sorted(tiempos.items()):
+                    salida.write(f"{etiqueta} {int(total * 1_000_000)}\n")
+        except OSError as e:
+            print(f"Error al escribir el perfil: {e}")  # Mostrar error si ocurre.
+            return
+        print(f"Perfilado terminado. Pilas en {archivo_pilas}, fases en {archivo_fases}.")
+        for etiqueta, (total, cantidad) in sorted(tiempos.items()):
+            print(f"  {etiqueta.replace(';', '/')}: {cantidad} mediciones, {total * 1000:.3f} ms")
+
+
 class ServidorTriqui:
     """
     Clase principal del servidor del juego Triqui.
     Gestiona las conexiones de los clientes y la lógica del juego.
     """
 
-    def __init__(self, host='localhost', port=8000):
+    def __init__(self, host='localhost', port=8000, tcp_nodelay=True, buffer_envio=None, buffer_recepcion=None):
         """
         Constructor del servidor.
         Inicializa las variables y configura el socket del servidor.
         :param host: Dirección IP del servidor.
         :param port: Puerto de escucha.
+        :param tcp_nodelay: Desactivar el algoritmo de Nagle en las conexiones de los clientes.
+        :param buffer_envio: Tamaño del buffer de envío (SO_SNDBUF) por cliente, o None para el del sistema.
+        :param buffer_recepcion: Tamaño del buffer de recepción (SO_RCVBUF) por cliente, o None para el del sistema.
         """
+        # Opciones de socket que se aplican a cada cliente aceptado.
+        self.tcp_nodelay = tcp_nodelay
+        self.buffer_envio = buffer_envio
+        self.buffer_recepcion = buffer_recepcion
+
         # Crear un socket TCP/IP.
         self.servidor = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
 
@@ -37,6 +246,15 @@ class ServidorTriqui:
         self.simbolos = ["X", "O"]  # Símbolos asignados a los jugadores.
         self.ultima_actividad = datetime.now()  # Registro de la última actividad en el servidor.
         self.servidor_activo = True  # Estado del servidor (activo o no).
+        self.perfilador = PerfiladorTriqui()  # Perfilador activable en tiempo de ejecución.
+        self.lote_local = threading.local()  # Lote de mensajes salientes pendiente en cada hilo.
+
+        # Activar el perfilado con la señal SIGUSR1 (no disponible en Windows).
+        if hasattr(signal, "SIGUSR1"):
+            try:
+                signal.signal(signal.SIGUSR1, lambda senal, marco: self.perfilador.iniciar())
+            except ValueError:  # Solo se puede instalar desde el hilo principal.
+                pass
 
         # Crear un hilo para verificar la inactividad del servidor.
         self.hilo_inactividad = threading.Thread(target=self.verificar_inactividad)
@@ -90,15 +308,16 @@ class ServidorTriqui:
         """
         print(f"Servidor iniciado en {self.servidor.getsockname()}")  # Mostrar dirección y puerto del servidor.
         try:
-            while self.servidor_activo and len(self.clientes) <= 2:  # Aceptar máximo 2 clientes.
+            # Seguir aceptando conexiones: las de control no ocupan lugar y los jugadores extra se rechazan.
+            while self.servidor_activo:
                 cliente, direccion = self.servidor.accept()  # Aceptar conexión de un cliente.
                 print(f"Cliente conectado desde {direccion}")  # Mostrar dirección del cliente conectado.
+                self.configurar_socket_cliente(cliente)  # Aplicar TCP_NODELAY y tamaños de buffer.
 
                 # Crear un hilo para manejar la conexión del cliente.
                 hilo = threading.Thread(target=self.manejar_cliente, args=(cliente,))
                 hilo.daemon = True  # Configurar hilo como demonio.
-                self.clientes.append(cliente)  # Agregar cliente a la lista.
-                hilo.start()  # Iniciar el hilo.
+                hilo.start()  # Iniciar el hilo (el cliente se registra al recibir su nombre).
         except KeyboardInterrupt:
             print("\nInterrupción manual. Cerrando servidor...")  # Mensaje al detener el servidor manualmente.
             self.detener_servidor()  # Detener el servidor.
@@ -106,33 +325,65 @@ class ServidorTriqui:
             print(f"Error inesperado: {e}")  # Mostrar errores no previstos.
             self.detener_servidor()  # Detener el servidor en caso de error.
 
+    def configurar_socket_cliente(self, cliente):
+        """
+        Aplica las opciones de socket configuradas a la conexión de un cliente.
+        :param cliente: Socket del cliente.
+        """
+        try:
+            if self.tcp_nodelay:  # Enviar cada escritura de inmediato, sin esperar a acumular datos.
+                cliente.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            if self.buffer_envio:
+                cliente.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.buffer_envio)
+            if self.buffer_recepcion:
+                cliente.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.buffer_recepcion)
+        except OSError as e:
+            print(f"No se pudieron aplicar las opciones de socket: {e}")  # Continuar con los valores del sistema.
+
     def manejar_cliente(self, cliente):
         """
         Maneja la conexión individual con cada cliente.
+        Los mensajes llegan uno por línea. El primero es el nombre del jugador, o un mensaje
+        de control {"tipo": "perfilar", "segundos": N} que se atiende sin ocupar un lugar de jugador.
         :param cliente: Socket del cliente.
         """
         try:
             self.ultima_actividad = datetime.now()  # Actualizar última actividad del servidor.
-            nombre = cliente.recv(1024).decode()  # Recibir el nombre del cliente.
+            lineas = self.leer_lineas(cliente)  # Mensajes del cliente, uno por línea.
+            nombre = next(lineas, None)  # Recibir el nombre del cliente.
             if not nombre:  # Si no se recibe nombre.
                 print("Cliente se desconectó antes de enviar su nombre.")  # Notificar desconexión.
                 self.eliminar_cliente(cliente)  # Eliminar cliente.
                 return
 
+            if self.es_mensaje_control(nombre):  # Conexión administrativa, no es un jugador.
+                self.atender_control(cliente, json.loads(nombre))
+                return
+
+            if len(self.clientes) >= 2:  # Ya hay dos jugadores registrados.
+                print(f"Conexión rechazada: la partida ya tiene dos jugadores ({nombre}).")  # Notificar rechazo.
+                return
+
+            self.clientes.append(cliente)  # Agregar cliente a la lista.
             self.nombres.append(nombre)  # Agregar nombre del cliente a la lista.
             print(f"Jugador registrado: {nombre}")  # Mostrar nombre del jugador registrado.
 
             if len(self.nombres) == 2:  # Iniciar juego cuando hay dos jugadores.
-                self.iniciar_juego()
+                with self.lote_salida("inicio_juego"):  # Agrupar los mensajes iniciales en una sola escritura por cliente.
+                    self.iniciar_juego()
 
-            while self.servidor_activo:  # Mantener conexión activa mientras el servidor esté activo.
-                mensaje = cliente.recv(1024).decode()  # Recibir mensaje del cliente.
-                self.ultima_actividad = datetime.now()  # Actualizar última actividad.
-                if not mensaje:  # Si no hay mensaje, desconectar cliente.
+            for mensaje in lineas:  # Termina cuando el cliente cierra la conexión.
+                if not self.servidor_activo:  # Mantener conexión activa mientras el servidor esté activo.
                     break
+                self.ultima_actividad = datetime.now()  # Actualizar última actividad.
+                inicio = time.perf_counter() if self.perfilador.activo else None  # Medir solo si se perfila.
                 datos = json.loads(mensaje)  # Decodificar mensaje JSON.
-                if datos["tipo"] == "movimiento":  # Si el mensaje es un movimiento.
-                    self.procesar_movimiento(datos["posicion"], self.clientes.index(cliente))  # Procesar movimiento.
+                if inicio is not None:
+                    self.perfilador.registrar(f"{datos.get('tipo')};decodificar", time.perf_counter() - inicio)
+                # Atribuir todas las fases al tipo entrante y enviar lo producido en una escritura por cliente.
+                with self.perfilador.evento_entrante(datos["tipo"]), self.lote_salida(datos["tipo"]):
+                    if datos["tipo"] == "movimiento":  # Si el mensaje es un movimiento.
+                        self.procesar_movimiento(datos["posicion"], self.clientes.index(cliente))  # Procesar movimiento.
         except (ConnectionResetError, ConnectionAbortedError):
             print("El cliente cerró la conexión abruptamente.")  # Notificar cierre abrupto.
         except Exception as e:
@@ -140,6 +391,55 @@ class ServidorTriqui:
         finally:
             self.eliminar_cliente(cliente)  # Eliminar cliente al finalizar la conexión.
 
+    def leer_lineas(self, cliente):
+        """
+        Lee del socket y entrega los mensajes completos, uno por línea.
+        Varios mensajes pueden llegar en una sola lectura, o uno partido en varias.
+        :param cliente: Socket del cliente.
+        :return: Generador de líneas de texto sin el salto de línea.
+        """
+        pendiente = b""  # Bytes recibidos que aún no forman una línea completa.
+        while True:
+            bloque = cliente.recv(1024)
+            if not bloque:  # El cliente cerró la conexión.
+                return
+            pendiente += bloque
+            *lineas, pendiente = pendiente.split(b"\n")
+            for linea in lineas:
+                linea = linea.decode().rstrip("\r")
+                if linea:  # Ignorar líneas vacías.
+                    yield linea
+
+    def es_mensaje_control(self, mensaje):
+        """
+        Indica si el primer mensaje de una conexión es un mensaje de control en lugar de un nombre.
+        :param mensaje: Texto recibido.
+        :return: True si es un JSON con tipo "perfilar".
+        """
+        try:
+            datos = json.loads(mensaje)
+        except ValueError:  # Un nombre de jugador normal.
+            return False
+        return isinstance(datos, dict) and datos.get("tipo") == "perfilar"
+
+    def atender_control(self, cliente, datos):
+        """
+        Atiende una conexión de control: activa el perfilado y responde con el resultado.
+        Ejemplo: echo '{"tipo": "perfilar", "segundos": 30}' | nc localhost 8000
+        :param cliente: Socket de la conexión de control.
+        :param datos: Mensaje de control decodificado.
+        """
+        if cliente.getpeername()[0] in ("127.0.0.1", "::1"):  # Solo se acepta desde la máquina local.
+            activado = self.perfilador.iniciar(datos.get("segundos", 30))
+        else:
+            print("Solicitud de perfilado rechazada: origen no local.")  # Notificar rechazo.
+            activado = False
+        respuesta = {"tipo": "perfilado", "activado": activado}
+        try:
+            cliente.sendall((json.dumps(respuesta) + "\n").encode())  # Informar al administrador.
+        except OSError:
+            pass
+
     def eliminar_cliente(self, cliente):
         """
         Elimina un cliente de la lista y cierra su conexión.
@@ -157,21 +457,77 @@ class ServidorTriqui:
         except Exception as e:
             print(f"Error al cerrar la conexión del cliente: {e}")  # Mostrar error si ocurre.
 
+    @contextlib.contextmanager
+    def lote_salida(self, tipo):
+        """
+        Agrupa los mensajes enviados dentro del bloque y los escribe al salir,
+        con una sola llamada a sendall por cliente. Los bloques anidados se unen al lote exterior.
+        :param tipo: Tipo del mensaje que originó el lote (etiqueta del envío en el perfilado).
+        """
+        if getattr(self.lote_local, "pendientes", None) is not None:  # Ya hay un lote abierto en este hilo.
+            yield
+            return
+        self.lote_local.pendientes = {}  # Cliente -> lista de mensajes codificados, en orden.
+        try:
+            yield
+        finally:
+            pendientes = self.lote_local.pendientes
+            self.lote_local.pendientes = None
+            for cliente, partes in pendientes.items():
+                self.escribir(cliente, b"".join(partes), tipo)  # Una escritura por cliente.
+
+    def enviar(self, cliente, mensaje):
+        """
+        Envía un mensaje a un cliente, o lo agrega al lote abierto en el hilo actual.
+        :param cliente: Socket del cliente.
+        :param mensaje: Mensaje en formato JSON a enviar.
+        """
+        with self.perfilador.fase(mensaje["tipo"], "codificar"):
+            datos = (json.dumps(mensaje) + "\n").encode()  # Un mensaje JSON por línea.
+        self.enviar_codificado(cliente, datos, mensaje["tipo"])
+
+    def enviar_codificado(self, cliente, datos, tipo):
+        """
+        Envía bytes ya codificados a un cliente, o los agrega al lote abierto en el hilo actual.
+        :param cliente: Socket del cliente.
+        :param datos: Mensaje codificado y terminado en salto de línea.
+        :param tipo: Tipo del mensaje (para el perfilado).
+        """
+        pendientes = getattr(self.lote_local, "pendientes", None)
+        if pendientes is not None:
+            pendientes.setdefault(cliente, []).append(datos)  # Se escribirá al cerrar el lote.
+        else:
+            self.escribir(cliente, datos, tipo)
+
+    def escribir(self, cliente, datos, tipo):
+        """
+        Escribe bytes en el socket de un cliente y lo elimina si la conexión falló.
+        :param cliente: Socket del cliente.
+        :param datos: Bytes a enviar.
+        :param tipo: Tipo del mensaje (para el perfilado).
+        """
+        if cliente not in self.clientes:  # El cliente pudo desconectarse mientras se armaba el lote.
+            return
+        try:
+            with self.perfilador.fase(tipo, "enviar"):
+                cliente.sendall(datos)  # Enviar todos los bytes en una sola llamada.
+            print(f"Mensaje enviado a cliente.")  # Confirmar el envío en consola.
+        except BrokenPipeError:  # Manejar error si el cliente se ha desconectado.
+            print(f"Cliente desconectado (BrokenPipeError). Eliminando cliente.")  # Notificar desconexión.
+            self.eliminar_cliente(cliente)  # Eliminar cliente de la lista.
+        except Exception as e:  # Manejar otros errores.
+            print(f"Error al enviar mensaje a cliente: {e}")  # Mostrar el error.
+            self.eliminar_cliente(cliente)  # Eliminar cliente problemático.
+
     def enviar_a_todos(self, mensaje):
         """
         Envía un mensaje a todos los clientes conectados.
         :param mensaje: Mensaje en formato JSON a enviar.
         """
+        with self.perfilador.fase(mensaje["tipo"], "codificar"):
+            datos = (json.dumps(mensaje) + "\n").encode()  # Codificar el mensaje una sola vez para todos los clientes.
         for cliente in self.clientes[:]:  # Iterar sobre una copia de la lista de clientes.
-            try:
-                cliente.send(json.dumps(mensaje).encode())  # Enviar el mensaje codificado a cada cliente.
-                print(f"Mensaje enviado a cliente.")  # Confirmar el envío en consola.
-            except BrokenPipeError:  # Manejar error si el cliente se ha desconectado.
-                print(f"Cliente desconectado (BrokenPipeError). Eliminando cliente.")  # Notificar desconexión.
-                self.eliminar_cliente(cliente)  # Eliminar cliente de la lista.
-            except Exception as e:  # Manejar otros errores.
-                print(f"Error al enviar mensaje a cliente: {e}")  # Mostrar el error.
-                self.eliminar_cliente(cliente)  # Eliminar cliente problemático.
+            self.enviar_codificado(cliente, datos, mensaje["tipo"])
 
     def iniciar_juego(self):
         """
@@ -188,7 +544,7 @@ class ServidorTriqui:
                 "nombres": self.nombres,  # Lista de nombres de los jugadores.
                 "puntuaciones": self.puntuaciones  # Puntuaciones actuales.
             }
-            self.clientes[i].send(json.dumps(info_inicial).encode())  # Enviar la información al jugador.
+            self.enviar(self.clientes[i], info_inicial)  # Enviar la información al jugador.
 
     def procesar_movimiento(self, posicion, jugador):
         """
@@ -197,43 +553,47 @@ class ServidorTriqui:
         :param jugador: Índice del jugador que realiza el movimiento.
         """
         print(f"Movimiento recibido: Jugador {jugador}, Posición: {posicion}")  # Mensaje de depuración.
-        if jugador == self.turno_actual and self.tablero[posicion] == " ":  # Validar turno y posición disponible.
-            self.tablero[posicion] = self.simbolos[jugador]  # Actualizar el tablero con el símbolo del jugador.
-            print(f"Tablero actualizado: {self.tablero}")  # Mostrar el tablero actualizado.
-
-            ganador = self.verificar_ganador()  # Verificar si hay un ganador.
-            if ganador:
-                print(f"Ganador detectado: Jugador {jugador}")  # Mensaje si hay ganador.
-            elif " " not in self.tablero:  # Verificar si el tablero está lleno.
-                print("El tablero está lleno, empate.")  # Mensaje de empate.
+        with self.perfilador.fase("movimiento", "validar"):
+            valido = jugador == self.turno_actual and self.tablero[posicion] == " "  # Validar turno y posición disponible.
+        if valido:
+            # Toda la lógica de reglas (puntuación, fin de partida y de juego) queda dentro de la fase.
+            with self.perfilador.fase("movimiento", "reglas"):
+                self.tablero[posicion] = self.simbolos[jugador]  # Actualizar el tablero con el símbolo del jugador.
+                ganador = self.verificar_ganador()  # Verificar si hay un ganador.
+                print(f"Tablero actualizado: {self.tablero}")  # Mostrar el tablero actualizado.
 
-            if ganador or " " not in self.tablero:  # Si hay ganador o empate.
                 if ganador:
-                    self.puntuaciones[jugador] += 1  # Incrementar la puntuación del ganador.
-                self.partidas_jugadas += 1  # Incrementar el contador de partidas jugadas.
-                self.tablero = [" " for _ in range(9)]  # Reiniciar el tablero.
-                print(f"Partidas jugadas: {self.partidas_jugadas}, Puntuaciones: {self.puntuaciones}")  # Depuración.
-
-                # Evaluar condiciones de empate o continuación del juego.
-                if self.partidas_jugadas >= 3:
-                    # Calcular la diferencia de puntos.
-                    diferencia = abs(self.puntuaciones[0] - self.puntuaciones[1])
+                    print(f"Ganador detectado: Jugador {jugador}")  # Mensaje si hay ganador.
+                elif " " not in self.tablero:  # Verificar si el tablero está lleno.
+                    print("El tablero está lleno, empate.")  # Mensaje de empate.
+
+                if ganador or " " not in self.tablero:  # Si hay ganador o empate.
+                    if ganador:
+                        self.puntuaciones[jugador] += 1  # Incrementar la puntuación del ganador.
+                    self.partidas_jugadas += 1  # Incrementar el contador de partidas jugadas.
+                    self.tablero = [" " for _ in range(9)]  # Reiniciar el tablero.
+                    print(f"Partidas jugadas: {self.partidas_jugadas}, Puntuaciones: {self.puntuaciones}")  # Depuración.
+
+                    # Evaluar condiciones de empate o continuación del juego.
+                    if self.partidas_jugadas >= 3:
+                        # Calcular la diferencia de puntos.
+                        diferencia = abs(self.puntuaciones[0] - self.puntuaciones[1])
                     
-                    if self.puntuaciones[0] == self.puntuaciones[1]:  # Si las puntuaciones están empatadas.
-                        print("Empate general. Continuando con una partida adicional.")  # Mensaje de desempate.
-                        self.iniciar_nueva_partida()  # Iniciar una nueva partida para desempatar.
-                    elif diferencia >= 2:  # Si un jugador tiene ventaja de al menos 2 puntos.
-                        print("El juego termina. Hay un ganador por ventaja de 2 puntos.")  # Fin del juego.
-                        self.enviar_fin_juego()  # Notificar el fin del juego.
+                        if self.puntuaciones[0] == self.puntuaciones[1]:  # Si las puntuaciones están empatadas.
+                            print("Empate general. Continuando con una partida adicional.")  # Mensaje de desempate.
+                            self.iniciar_nueva_partida()  # Iniciar una nueva partida para desempatar.
+                        elif diferencia >= 2:  # Si un jugador tiene ventaja de al menos 2 puntos.
+                            print("El juego termina. Hay un ganador por ventaja de 2 puntos.")  # Fin del juego.
+                            self.enviar_fin_juego()  # Notificar el fin del juego.
+                        else:
+                            print("El juego termina con las 3 partidas jugadas.")  # Fin tras 3 partidas sin desempate.
+                            self.enviar_fin_juego()  # Notificar el fin del juego.
                     else:
-                        print("El juego termina con las 3 partidas jugadas.")  # Fin tras 3 partidas sin desempate.
-                        self.enviar_fin_juego()  # Notificar el fin del juego.
+                        self.iniciar_nueva_partida()  # Iniciar una nueva partida si no se han jugado 3 aún.
                 else:
-                    self.iniciar_nueva_partida()  # Iniciar una nueva partida si no se han jugado 3 aún.
-            else:
-                self.turno_actual = 1 - self.turno_actual  # Cambiar turno al otro jugador.
-                print(f"Cambio de turno a jugador {self.turno_actual}")  # Depuración.
-                self.enviar_estado_juego()  # Enviar el estado actualizado a los jugadores.
+                    self.turno_actual = 1 - self.turno_actual  # Cambiar turno al otro jugador.
+                    print(f"Cambio de turno a jugador {self.turno_actual}")  # Depuración.
+                    self.enviar_estado_juego()  # Enviar el estado actualizado a los jugadores.
         else:
             print("Movimiento inválido o fuera de turno.")  # Notificar un movimiento inválido.
 
@@ -325,7 +685,18 @@ class ServidorTriqui:
         self.enviar_estado_juego()  # Enviar estado inicial del juego.
 
 if __name__ == "__main__":
+    # Crear un analizador de argumentos para capturar parámetros desde la línea de comandos.
+    parser = argparse.ArgumentParser(description="Servidor para el juego Triqui.")
+    parser.add_argument("--host", type=str, default="localhost", help="Dirección IP de escucha (por defecto: localhost).")
+    parser.add_argument("--port", type=int, default=8000, help="Puerto de escucha (por defecto: 8000).")
+    # Opciones de socket para las conexiones de los clientes.
+    parser.add_argument("--sin-nodelay", action="store_true", help="Mantener activo el algoritmo de Nagle (sin TCP_NODELAY).")
+    parser.add_argument("--buffer-envio", type=int, default=None, help="Tamaño de SO_SNDBUF en bytes (por defecto: el del sistema).")
+    parser.add_argument("--buffer-recepcion", type=int, default=None, help="Tamaño de SO_RCVBUF en bytes (por defecto: el del sistema).")
+    args = parser.parse_args()  # Parsear los argumentos proporcionados.
+
     # Crear una instancia del servidor y arrancarlo.
-    servidor = ServidorTriqui()
+    servidor = ServidorTriqui(args.host, args.port, tcp_nodelay=not args.sin_nodelay,
+                              buffer_envio=args.buffer_envio, buffer_recepcion=args.buffer_recepcion)
     servidor.iniciar_servidor()
 